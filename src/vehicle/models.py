@@ -3,13 +3,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from datetime import date, datetime, timezone
-from typing import Any
+from datetime import date
+from functools import lru_cache
+from typing import Any, Final
 
 from mashumaro import field_options
 from mashumaro.config import BaseConfig
 from mashumaro.mixins.orjson import DataClassORJSONMixin
-from mashumaro.types import SerializationStrategy
 
 from .const import (
     VehicleInterior,
@@ -17,32 +17,46 @@ from .const import (
     VehicleType,
 )
 
+# Values RDW uses to indicate a field has no value
+EMPTY_VALUES: Final = frozenset({"Niet geregistreerd", "N.v.t."})
 
-class StringIsBoolean(SerializationStrategy):
-    """Boolean serialization strategy for Dutch textual strings."""
+# Fields that may contain one of the empty values above
+NULLABLE_FIELDS: Final = ("inrichting", "tellerstandoordeel", "voertuigsoort")
 
-    def serialize(self, value: bool) -> str:  # noqa: FBT001
-        """Serialize a boolean to an Dutch string."""
-        return "Ja" if value else "Nee"
+# Fields that are provided in all caps, but are nicer in title case
+PRETTY_FIELDS: Final = ("merk", "handelsbenaming")
 
-    def deserialize(self, value: str) -> bool:
-        """Deserialize an Dutch string to a boolean."""
-        return value == "Ja"
 
+@lru_cache(maxsize=4096)
+def prettify(value: str) -> str:
+    """Turn an all caps brand or model name into a title cased one."""
+    return value.strip().title()
 
-class DateStrategy(SerializationStrategy):
-    """String serialization strategy to handle the date format."""
 
-    def serialize(self, value: date) -> str:
-        """Serialize date to their specific format."""
-        return datetime.strftime(value, "%Y%m%d")
+def deserialize_boolean(value: str) -> bool:
+    """Deserialize a Dutch string (Ja/Nee) to a boolean."""
+    return value == "Ja"
 
-    def deserialize(self, value: str) -> date:
-        """Deserialize their date format to a date."""
-        return datetime.strptime(value, "%Y%m%d").replace(tzinfo=timezone.utc).date()
 
+def serialize_boolean(value: bool) -> str:  # noqa: FBT001
+    """Serialize a boolean to a Dutch string (Ja/Nee)."""
+    return "Ja" if value else "Nee"
 
-@dataclass
+
+def deserialize_date(value: str) -> date:
+    """Deserialize an RDW date string (YYYYMMDD) to a date."""
+    if len(value) != 8 or not (value.isascii() and value.isdigit()):
+        msg = f"Invalid date: {value}"
+        raise ValueError(msg)
+    return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+
+
+def serialize_date(value: date) -> str:
+    """Serialize a date to an RDW date string (YYYYMMDD)."""
+    return f"{value.year:04d}{value.month:02d}{value.day:02d}"
+
+
+@dataclass(slots=True)
 # pylint: disable-next=too-many-instance-attributes
 class Vehicle(DataClassORJSONMixin):
     """Object holding vehicle information.
@@ -81,20 +95,34 @@ class Vehicle(DataClassORJSONMixin):
     class Config(BaseConfig):
         """Mashumaro configuration."""
 
-        serialization_strategy = {bool: StringIsBoolean(), date: DateStrategy()}  # noqa: RUF012
         serialize_by_alias = True
 
     brand: str = field(metadata=field_options(alias="merk"))
     license_plate: str = field(metadata=field_options(alias="kenteken"))
     model: str = field(metadata=field_options(alias="handelsbenaming"))
     apk_expiration: date | None = field(
-        default=None, metadata=field_options(alias="vervaldatum_apk")
+        default=None,
+        metadata=field_options(
+            alias="vervaldatum_apk",
+            deserialize=deserialize_date,
+            serialize=serialize_date,
+        ),
     )
     ascription_date: date | None = field(
-        default=None, metadata=field_options(alias="datum_tenaamstelling")
+        default=None,
+        metadata=field_options(
+            alias="datum_tenaamstelling",
+            deserialize=deserialize_date,
+            serialize=serialize_date,
+        ),
     )
     ascription_possible: bool | None = field(
-        default=None, metadata=field_options(alias="tenaamstellen_mogelijk")
+        default=None,
+        metadata=field_options(
+            alias="tenaamstellen_mogelijk",
+            deserialize=deserialize_boolean,
+            serialize=serialize_boolean,
+        ),
     )
     energy_label: str | None = field(
         default=None, metadata=field_options(alias="zuinigheidslabel")
@@ -103,7 +131,12 @@ class Vehicle(DataClassORJSONMixin):
         default=None, metadata=field_options(alias="cilinderinhoud")
     )
     exported: bool | None = field(
-        default=None, metadata=field_options(alias="export_indicator")
+        default=None,
+        metadata=field_options(
+            alias="export_indicator",
+            deserialize=deserialize_boolean,
+            serialize=serialize_boolean,
+        ),
     )
     interior: VehicleInterior | None = field(
         default=None, metadata=field_options(alias="inrichting")
@@ -113,13 +146,23 @@ class Vehicle(DataClassORJSONMixin):
         metadata=field_options(alias="jaar_laatste_registratie_tellerstand"),
     )
     liability_insured: bool | None = field(
-        default=None, metadata=field_options(alias="wam_verzekerd")
+        default=None,
+        metadata=field_options(
+            alias="wam_verzekerd",
+            deserialize=deserialize_boolean,
+            serialize=serialize_boolean,
+        ),
     )
     list_price: int | None = field(
         default=None, metadata=field_options(alias="catalogusprijs")
     )
     first_admission: date | None = field(
-        default=None, metadata=field_options(alias="datum_eerste_toelating")
+        default=None,
+        metadata=field_options(
+            alias="datum_eerste_toelating",
+            deserialize=deserialize_date,
+            serialize=serialize_date,
+        ),
     )
     mass_empty: int | None = field(
         default=None, metadata=field_options(alias="massa_ledig_voertuig")
@@ -149,10 +192,19 @@ class Vehicle(DataClassORJSONMixin):
     )
     pending_recall: bool | None = field(
         default=None,
-        metadata=field_options(alias="openstaande_terugroepactie_indicator"),
+        metadata=field_options(
+            alias="openstaande_terugroepactie_indicator",
+            deserialize=deserialize_boolean,
+            serialize=serialize_boolean,
+        ),
     )
     taxi: bool | None = field(
-        default=None, metadata=field_options(alias="taxi_indicator")
+        default=None,
+        metadata=field_options(
+            alias="taxi_indicator",
+            deserialize=deserialize_boolean,
+            serialize=serialize_boolean,
+        ),
     )
     vehicle_type: VehicleType | None = field(
         default=None, metadata=field_options(alias="voertuigsoort")
@@ -171,13 +223,16 @@ class Vehicle(DataClassORJSONMixin):
             The adjusted values of the model.
 
         """
+        get = d.get
+
         # Convert certain values to None.
-        for key in ("inrichting", "tellerstandoordeel", "voertuigsoort"):
-            if d.get(key) in {"Niet geregistreerd", "N.v.t."}:
+        for key in NULLABLE_FIELDS:
+            if get(key) in EMPTY_VALUES:
                 d[key] = None
 
         # Make Brand and Model pretty
-        for key in ("merk", "handelsbenaming"):
-            d[key] = d[key].strip().title()
+        for key in PRETTY_FIELDS:
+            if (value := get(key)) is not None:
+                d[key] = prettify(value)
 
         return d
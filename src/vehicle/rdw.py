@@ -3,30 +3,239 @@
 from __future__ import annotations
 
 import asyncio
+import random
 import socket
-from dataclasses import dataclass
-from typing import Any, Self
-
-import orjson
-from aiohttp.client import ClientError, ClientResponseError, ClientSession
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from time import monotonic
+from types import MappingProxyType
+from typing import Any, ClassVar, Self
+
+from aiohttp import ClientTimeout, TCPConnector
+from aiohttp.client import (
+    ClientError,
+    ClientResponse,
+    ClientResponseError,
+    ClientSession,
+)
 from aiohttp.hdrs import METH_GET
+from mashumaro.codecs.orjson import ORJSONDecoder
 from yarl import URL
 
 from .const import Dataset
 from .exceptions import RDWConnectionError, RDWError, RDWUnknownLicensePlateError
 from .models import Vehicle
 
+API_BASE_URL = URL("https://opendata.rdw.nl/resource/")
+DATASET_URLS = {
+    dataset: API_BASE_URL.join(URL(f"{dataset.value}.json")) for dataset in Dataset
+}
+HEADERS = MappingProxyType({"Accept": "application/json, text/plain, */*"})
+
+# Maximum number of license plates to look up in a single request
+BATCH_SIZE = 50
+
+VEHICLES_DECODER = ORJSONDecoder(list[Vehicle])
+
+# Maximum time in seconds to remember a license plate is unknown to the RDW
+NEGATIVE_CACHE_TTL = 60.0
+
+# Number of attempts for requests failing on transient errors, and the
+# base delay in seconds of the exponential backoff between them
+REQUEST_ATTEMPTS = 3
+RETRY_BACKOFF = 0.2
+
+# Maximum Retry-After in seconds to wait for, longer waits are not retried
+MAX_RETRY_AFTER = 5.0
+
+# Characters removed from license plates during normalization
+LICENSE_PLATE_SEPARATORS = str.maketrans("", "", "- \t\r\n")
+
+# Seconds the shared session is kept open without users, for reuse by
+# RDW objects created later
+SHARED_SESSION_IDLE_TIMEOUT = 75.0
+
+
+@dataclass
+class _SharedSession:
+    """Client session shared by the RDW objects on an event loop."""
+
+    session: ClientSession
+    users: int = 0
+    idle_close: asyncio.Task[None] | None = None
+
+    def cancel_idle_close(self) -> None:
+        """Cancel closing the session for being unused, if scheduled."""
+        if self.idle_close is not None:
+            self.idle_close.cancel()
+            self.idle_close = None
+
 
 @dataclass
 class RDW:
-    """Main class for handling data fetching from RDW."""
+    """Main class for handling data fetching from RDW.
+
+    Looked up vehicles are cached for `cache_ttl` seconds (an hour by
+    default), keeping at most `cache_maxsize` license plates. Set
+    `cache_ttl` to 0 to disable caching. Every lookup returns a copy of
+    the cached vehicle, so changing it does not affect later lookups.
+    """
 
     session: ClientSession | None = None
     license_plate: str | None = None
-    request_timeout: int = 10
-    _close_session: bool = False
+    request_timeout: float = 10
+    cache_ttl: float = 3600
+    cache_maxsize: int = 1024
+
+    _cache: OrderedDict[str, tuple[float, list[Vehicle]]] = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False
+    )
+    _shared_session_in_use: ClientSession | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    _shared_sessions: ClassVar[dict[asyncio.AbstractEventLoop, _SharedSession]] = {}
+    _shared_sessions_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    async def shared_session(cls) -> ClientSession:
+        """Get the client session shared by all RDW objects.
+
+        The session is created on first use and reused by every RDW object
+        on the running event loop that has not been given a session of its
+        own, so connections to the RDW open data portal are kept alive
+        between lookups. Once the last of those RDW objects is closed, the
+        session is kept open for SHARED_SESSION_IDLE_TIMEOUT seconds for
+        RDW objects created later, and closed when unused by then or when
+        the event loop shuts down (e.g., at the end of `asyncio.run()`).
+
+        Returns
+        -------
+            The shared client session for the running event loop.
+
+        """
+        return cls._get_shared_session(asyncio.get_running_loop()).session
+
+    @classmethod
+    def _get_shared_session(cls, loop: asyncio.AbstractEventLoop) -> _SharedSession:
+        """Get the shared session of an event loop, creating it if needed.
+
+        Shared sessions of closed event loops are forgotten along the way.
+
+        Args:
+        ----
+            loop: The running event loop.
+
+        Returns:
+        -------
+            The shared session of the event loop.
+
+        """
+        with cls._shared_sessions_lock:
+            shared = cls._shared_sessions.get(loop)
+            if shared is None or shared.session.closed:
+                if shared is not None:
+                    shared.cancel_idle_close()
+                for closed_loop in [
+                    other for other in cls._shared_sessions if other.is_closed()
+                ]:
+                    del cls._shared_sessions[closed_loop]
+                shared = cls._shared_sessions[loop] = _SharedSession(
+                    ClientSession(
+                        connector=TCPConnector(
+                            limit=128,
+                            limit_per_host=64,
+                            keepalive_timeout=75,
+                        ),
+                    )
+                )
+            return shared
+
+    @classmethod
+    async def close_shared_session(cls) -> None:
+        """Close the client session shared by the RDW objects.
+
+        Closes the shared session of the running event loop right away,
+        even when RDW objects are still using it; those objects will get a
+        new session on their next lookup.
+        """
+        loop = asyncio.get_running_loop()
+        with cls._shared_sessions_lock:
+            shared = cls._shared_sessions.pop(loop, None)
+        if shared is not None:
+            shared.cancel_idle_close()
+            await shared.session.close()
+
+    @classmethod
+    async def _use_shared_session(cls, in_use: ClientSession | None) -> ClientSession:
+        """Get the shared session, counting a new user of it.
+
+        Args:
+        ----
+            in_use: The shared session the RDW object is already using.
+
+        Returns:
+        -------
+            The shared client session for the running event loop.
+
+        """
+        shared = cls._get_shared_session(asyncio.get_running_loop())
+        if shared.session is not in_use:
+            shared.users += 1
+            shared.cancel_idle_close()
+        return shared.session
+
+    @classmethod
+    def _release_shared_session(cls, session: ClientSession) -> None:
+        """Release a shared session, closing it once it has been idle.
+
+        Args:
+        ----
+            session: The shared session an RDW object is done with.
+
+        """
+        loop = asyncio.get_running_loop()
+        shared = cls._shared_sessions.get(loop)
+        if shared is None or shared.session is not session:
+            return
+        shared.users -= 1
+        if not shared.users:
+            shared.idle_close = loop.create_task(
+                cls._close_idle_shared_session(loop, shared)
+            )
+
+    @classmethod
+    async def _close_idle_shared_session(
+        cls,
+        loop: asyncio.AbstractEventLoop,
+        shared: _SharedSession,
+    ) -> None:
+        """Close a shared session that stays unused.
+
+        The session is closed after SHARED_SESSION_IDLE_TIMEOUT seconds,
+        or right away when the event loop shuts down and cancels this task.
+        It is left open when a new user cancels this task.
+
+        Args:
+        ----
+            loop: The event loop of the shared session.
+            shared: The shared session without users.
+
+        """
+        task = asyncio.current_task()
+        try:
+            await asyncio.sleep(SHARED_SESSION_IDLE_TIMEOUT)
+        finally:
+            if shared.idle_close is task:
+                shared.idle_close = None
+                with cls._shared_sessions_lock:
+                    del cls._shared_sessions[loop]
+                await shared.session.close()
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def normalize_license_plate(license_plate: str) -> str:
         """Normalize license plate.
 
@@ -39,18 +248,50 @@ class RDW:
             Normalized license plate.
 
         """
-        return license_plate.upper().replace("-", "").replace(" ", "").strip()
+        return license_plate.translate(LICENSE_PLATE_SEPARATORS).upper()
+
+    @staticmethod
+    def _retry_delay(attempt: int, exception: Exception) -> float | None:
+        """Determine how long to wait before retrying a failed request.
+
+        Args:
+        ----
+            attempt: Number of the failed attempt, starting at zero.
+            exception: Exception raised by the failed attempt.
+
+        Returns:
+        -------
+            Seconds to wait before retrying, or None if the failure is not
+            transient or the server asks to wait longer than MAX_RETRY_AFTER,
+            and the request should not be retried.
+
+        """
+        if isinstance(exception, ClientResponseError):
+            if exception.status != 429 and exception.status < 500:
+                return None
+            if (
+                exception.headers is not None
+                and (retry_after := exception.headers.get("Retry-After", "")).isascii()
+                and retry_after.isdigit()
+            ):
+                delay = float(retry_after)
+                return delay if delay <= MAX_RETRY_AFTER else None
+        return RETRY_BACKOFF * 2.0**attempt + random.uniform(0, 0.1)  # noqa: S311
 
     async def _request(
         self,
         dataset: Dataset,
         *,
         data: dict[str, Any] | None = None,
-    ) -> str:
+    ) -> bytes:
         """Handle a request to a RDW open data (Socrata).
 
         A generic method for sending/handling HTTP requests done against
-        the public RDW data.
+        the public RDW data. Requests failing on connection errors, rate
+        limiting or server errors are retried with an exponential backoff.
+
+        The request timeout applies to each attempt, so a request can take
+        up to REQUEST_ATTEMPTS times the timeout, plus the waits in between.
 
         Args:
         ----
@@ -59,8 +300,7 @@ class RDW:
 
         Returns:
         -------
-            A Python dictionary (JSON decoded) with the response from
-            the API.
+            The raw (JSON encoded) response body from the API.
 
         Raises:
         ------
@@ -69,47 +309,111 @@ class RDW:
             RDWError: Received an unexpected response from the Socrata API.
 
         """
-        url = URL("https://opendata.rdw.nl/resource/").join(
-            URL(f"{dataset.value}.json"),
-        )
-
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-        }
-
-        if self.session is None:
-            self.session = ClientSession()
-            self._close_session = True
-
-        try:
-            async with asyncio.timeout(self.request_timeout):
-                response = await self.session.request(
+        if (session := self.session) is None:
+            session = await self._use_shared_session(self._shared_session_in_use)
+            self._shared_session_in_use = session
+
+        timeout = ClientTimeout(total=self.request_timeout)
+        attempt = 0
+        while True:
+            try:
+                response = await session.request(
                     METH_GET,
-                    url.with_query(data),
-                    headers=headers,
+                    DATASET_URLS[dataset].with_query(data),
+                    headers=HEADERS,
+                    timeout=timeout,
                 )
                 response.raise_for_status()
-        except asyncio.TimeoutError as exception:
-            msg = "Timeout occurred while connecting to the Socrata API"
-            raise RDWConnectionError(msg) from exception
-        except (
-            ClientError,
-            ClientResponseError,
-            socket.gaierror,
-        ) as exception:
-            msg = "Error occurred while communicating with Socrata API"
-            raise RDWConnectionError(msg) from exception
+                body = await self._read_response(response)
+                break
+            except asyncio.TimeoutError as exception:
+                msg = "Timeout occurred while connecting to the Socrata API"
+                raise RDWConnectionError(msg) from exception
+            except (
+                ClientError,
+                ClientResponseError,
+                socket.gaierror,
+            ) as exception:
+                delay = self._retry_delay(attempt, exception)
+                attempt += 1
+                if delay is None or attempt >= REQUEST_ATTEMPTS:
+                    msg = "Error occurred while communicating with Socrata API"
+                    raise RDWConnectionError(msg) from exception
+                await asyncio.sleep(delay)
+
+        return body
+
+    @staticmethod
+    async def _read_response(response: ClientResponse) -> bytes:
+        """Read the JSON encoded body of a response from the Socrata API.
+
+        The Content-Type header is checked before touching the body, so
+        the body is only decoded to text for unexpected responses.
+
+        Args:
+        ----
+            response: Response from the Socrata API.
+
+        Returns:
+        -------
+            The raw (JSON encoded) response body.
+
+        Raises:
+        ------
+            RDWError: Received an unexpected response from the Socrata API.
 
+        """
         content_type = response.headers.get("Content-Type", "")
-        text = await response.text()
         if "application/json" not in content_type:
+            text = await response.text(errors="replace")
             msg = "Unexpected response from the Socrata API"
             raise RDWError(
                 msg,
                 {"Content-Type": content_type, "response": text},
             )
 
-        return text
+        return await response.read()
+
+    def _cache_get(self, license_plate: str) -> list[Vehicle] | None:
+        """Get the cached lookup result of a license plate.
+
+        Args:
+        ----
+            license_plate: Normalized license plate.
+
+        Returns:
+        -------
+            The vehicles found for the license plate, or None if the license
+            plate is not cached or the cached result has expired.
+
+        """
+        if (cached := self._cache.get(license_plate)) is None:
+            return None
+        expires, vehicles = cached
+        if expires <= monotonic():
+            del self._cache[license_plate]
+            return None
+        self._cache.move_to_end(license_plate)
+        return vehicles
+
+    def _cache_set(self, license_plate: str, vehicles: list[Vehicle]) -> None:
+        """Cache the lookup result of a license plate.
+
+        Unknown license plates are cached as well, but for a shorter time.
+
+        Args:
+        ----
+            license_plate: Normalized license plate.
+            vehicles: The vehicles found for the license plate.
+
+        """
+        if self.cache_ttl <= 0:
+            return
+        ttl = self.cache_ttl if vehicles else min(self.cache_ttl, NEGATIVE_CACHE_TTL)
+        self._cache[license_plate] = (monotonic() + ttl, vehicles)
+        self._cache.move_to_end(license_plate)
+        if len(self._cache) > self.cache_maxsize:
+            self._cache.popitem(last=False)
 
     async def vehicle(self, license_plate: str | None = None) -> Vehicle:
         """Get devices information about a Vehicle.
@@ -134,26 +438,94 @@ class RDW:
             msg = "No license plate provided"
             raise RDWError(msg)
 
-        data = await self._request(
-            Dataset.PLATED_VEHICLES,
-            data={"kenteken": self.normalize_license_plate(license_plate)},
-        )
-        # pylint: disable=no-member
-        vehicles = orjson.loads(data)
+        normalized_license_plate = self.normalize_license_plate(license_plate)
+        if (vehicles := self._cache_get(normalized_license_plate)) is None:
+            data = await self._request(
+                Dataset.PLATED_VEHICLES,
+                data={"kenteken": normalized_license_plate},
+            )
+            vehicles = VEHICLES_DECODER.decode(data)
+            self._cache_set(normalized_license_plate, vehicles)
+
         if not vehicles:
             msg = f"License plate {license_plate} not found in RDW Socrata database"
             raise RDWUnknownLicensePlateError(msg)
 
-        return Vehicle.from_dict(vehicles[0])
+        return replace(vehicles[0])
+
+    async def vehicles(self, license_plates: list[str]) -> list[Vehicle]:
+        """Get information about multiple vehicles at once.
+
+        The license plates are looked up in batches, using a single request
+        per batch instead of a request per license plate. License plates
+        found in the cache are not requested again, and the results of the
+        requested ones are added to it. The vehicles are returned in the
+        order of the given license plates, once per license plate. License
+        plates that are not known to the RDW are left out.
+
+        Args:
+        ----
+            license_plates: License plates of the vehicles.
+
+        Returns:
+        -------
+            A list of Vehicle objects, with information about the vehicles.
+
+        """
+        plates = list(
+            dict.fromkeys(
+                self.normalize_license_plate(license_plate)
+                for license_plate in license_plates
+            )
+        )
+        vehicles: dict[str, list[Vehicle]] = {}
+        missing = []
+        for plate in plates:
+            if (cached := self._cache_get(plate)) is None:
+                missing.append(plate)
+            else:
+                vehicles[plate] = cached
+
+        requests = []
+        for i in range(0, len(missing), BATCH_SIZE):
+            # SoQL string literals are single quoted, quotes escaped by doubling
+            batch = "','".join(
+                plate.replace("'", "''") for plate in missing[i : i + BATCH_SIZE]
+            )
+            requests.append(
+                self._request(
+                    Dataset.PLATED_VEHICLES,
+                    data={"$where": f"kenteken in('{batch}')"},
+                )
+            )
+        found: dict[str, list[Vehicle]] = {}
+        for data in await asyncio.gather(*requests):
+            # pylint: disable-next=not-an-iterable
+            for vehicle in VEHICLES_DECODER.decode(data):
+                found.setdefault(vehicle.license_plate, []).append(vehicle)
+        for plate in missing:
+            vehicles[plate] = found.get(plate, [])
+            self._cache_set(plate, vehicles[plate])
+
+        return [replace(vehicles[plate][0]) for plate in plates if vehicles[plate]]
 
     async def close(self) -> None:
-        """Close open client session."""
-        if self.session and self._close_session:
-            await self.session.close()
+        """Close open client session.
+
+        Sessions passed in by the caller are left open. The shared session
+        is closed once it has been unused for a while by all RDW objects.
+        """
+        if (session := self._shared_session_in_use) is not None:
+            self._shared_session_in_use = None
+            self._release_shared_session(session)
 
     async def __aenter__(self) -> Self:
         """Async enter.
 
+        The client works with any asyncio event loop; installing uvloop
+        (available as the `uvloop` extra) lowers the per-request overhead
+        of the event loop when doing many lookups.
+
         Returns
         -------
             The RDW object.
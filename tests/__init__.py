@@ -1,8 +1,10 @@
 """Asynchronous Python client providing RDW vehicle information."""
 
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache
 def load_fixture(filename: str) -> str:
     """Load a fixture."""
     path = Path(__package__) / "fixtures" / filename
@@ -0,0 +1,65 @@
+"""Fixtures for the vehicle Library tests."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import aiohttp
+import pytest
+from aresponses import ResponsesMockServer
+
+from vehicle.const import Dataset
+
+from . import load_fixture
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Callable
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """Run the tests on uvloop, on platforms where it is available."""
+    try:
+        import uvloop  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    policy: asyncio.AbstractEventLoopPolicy = uvloop.EventLoopPolicy()
+    return policy
+
+
+@pytest.fixture
+async def session() -> AsyncGenerator[aiohttp.ClientSession, None]:
+    """Return an aiohttp client session, closed after the test."""
+    async with aiohttp.ClientSession() as client_session:
+        yield client_session
+
+
+@pytest.fixture
+def rdw_mock(aresponses: ResponsesMockServer) -> Callable[..., None]:
+    """Return a helper that mocks responses of the RDW vehicles dataset."""
+
+    def _add(  # noqa: PLR0913
+        fixture: str | None = None,
+        *,
+        text: str = "",
+        status: int = 200,
+        content_type: str = "application/json",
+        headers: dict[str, str] | None = None,
+        repeat: int = 1,
+    ) -> None:
+        """Mock a response, with the contents of a fixture or the given text."""
+        aresponses.add(
+            "opendata.rdw.nl",
+            f"/resource/{Dataset.PLATED_VEHICLES.value}.json",
+            "GET",
+            aresponses.Response(
+                status=status,
+                content_type=content_type,
+                headers=headers,
+                text=load_fixture(fixture) if fixture else text,
+            ),
+            repeat=repeat,
+        )
+
+    return _add
@@ -1,8 +1,13 @@
 """Tests for the vehicle Library."""
 
+from collections.abc import Callable
+
 import aiohttp
+import orjson
 import pytest
-from aresponses import ResponsesMockServer
+from aiohttp.web_request import BaseRequest
+from aresponses import Response, ResponsesMockServer
+from mashumaro.exceptions import MissingField
 from syrupy import SnapshotAssertion
 
 from vehicle import (
@@ -11,6 +16,7 @@ from vehicle import (
     RDWUnknownLicensePlateError,
     Vehicle,
 )
+from vehicle import rdw as rdw_module
 
 from . import load_fixture
 
@@ -24,48 +30,265 @@ from . import load_fixture
     ],
 )
 async def test_vehicle_data(
-    aresponses: ResponsesMockServer,
     license_plate: str,
     snapshot: SnapshotAssertion,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
 ) -> None:
     """Test getting Vehicle information."""
+    rdw_mock(f"{license_plate}.json")
+    rdw = RDW(session=session)
+    vehicle: Vehicle = await rdw.vehicle(license_plate)
+    assert vehicle == snapshot
+    assert vehicle.to_json() == snapshot
+
+
+async def test_no_vehicle(
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test getting non-existing Vehicle."""
+    rdw_mock("no_vehicles.json")
+    rdw = RDW(session=session)
+    with pytest.raises(RDWUnknownLicensePlateError):
+        await rdw.vehicle("00-00-00")
+
+
+async def test_vehicle_cache(
+    aresponses: ResponsesMockServer,
+    monkeypatch: pytest.MonkeyPatch,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test looked up vehicles are cached until they expire."""
+    now = 1000.0
+    monkeypatch.setattr(rdw_module, "monotonic", lambda: now)
+    rdw_mock("11ZKZ3.json", repeat=2)
+    rdw = RDW(session=session, cache_ttl=3600)
+    vehicle = await rdw.vehicle("11-ZKZ-3")
+    assert await rdw.vehicle("11ZKZ3") == vehicle
+    assert len(aresponses.history) == 1
+
+    now += 3600
+    assert await rdw.vehicle("11ZKZ3") == vehicle
+    assert len(aresponses.history) == 2
+
+
+async def test_vehicle_cache_default(
+    aresponses: ResponsesMockServer,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test repeated lookups of a license plate are cached by default."""
+    rdw_mock("11ZKZ3.json")
+    rdw = RDW(session=session)
+    assert await rdw.vehicle("11-ZKZ-3") == await rdw.vehicle("11ZKZ3")
+    aresponses.assert_plan_strictly_followed()
+
+
+async def test_vehicle_cache_not_compared(
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test the cache is not taken into account when comparing RDW objects."""
+    rdw_mock("11ZKZ3.json")
+    rdw = RDW(session=session)
+    await rdw.vehicle("11ZKZ3")
+    assert rdw == RDW(session=session)
+
+
+async def test_vehicle_cache_copy(
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test changing a looked up vehicle does not change the cached one."""
+    rdw_mock("11ZKZ3.json")
+    rdw = RDW(session=session)
+    vehicle = await rdw.vehicle("11ZKZ3")
+    vehicle.brand = "Trabant"
+    cached = await rdw.vehicle("11ZKZ3")
+    assert cached is not vehicle
+    assert cached.brand == "Skoda"
+
+
+async def test_vehicle_cache_disabled(
+    aresponses: ResponsesMockServer,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test every lookup does a request when caching is disabled."""
+    rdw_mock("11ZKZ3.json", repeat=2)
+    rdw = RDW(session=session, cache_ttl=0)
+    await rdw.vehicle("11ZKZ3")
+    await rdw.vehicle("11ZKZ3")
+    aresponses.assert_plan_strictly_followed()
+
+
+async def test_vehicle_cache_unknown(
+    aresponses: ResponsesMockServer,
+    monkeypatch: pytest.MonkeyPatch,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test unknown license plates are cached for a shorter time."""
+    now = 1000.0
+    monkeypatch.setattr(rdw_module, "monotonic", lambda: now)
+    rdw_mock("no_vehicles.json", repeat=2)
+    rdw = RDW(session=session, cache_ttl=3600)
+    for _ in range(2):
+        with pytest.raises(RDWUnknownLicensePlateError):
+            await rdw.vehicle("00-00-00")
+    assert len(aresponses.history) == 1
+
+    now += rdw_module.NEGATIVE_CACHE_TTL
+    with pytest.raises(RDWUnknownLicensePlateError):
+        await rdw.vehicle("00-00-00")
+    assert len(aresponses.history) == 2
+
+
+async def test_vehicle_cache_maxsize(
+    aresponses: ResponsesMockServer,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test the least recently used license plate is evicted from the cache."""
+    for license_plate in ("11ZKZ3", "0001TJ", "11ZKZ3"):
+        rdw_mock(f"{license_plate}.json")
+    rdw = RDW(session=session, cache_ttl=3600, cache_maxsize=1)
+    await rdw.vehicle("11ZKZ3")
+    await rdw.vehicle("0001TJ")
+    await rdw.vehicle("0001TJ")
+    await rdw.vehicle("11ZKZ3")
+    assert len(aresponses.history) == 3
+    aresponses.assert_plan_strictly_followed()
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["2022014", "202201040", "2022-01-04", "2022 1 4", "+0220104"],
+)
+def test_invalid_date(value: str) -> None:
+    """Test dates not in the RDW date format are rejected."""
+    with pytest.raises(ValueError, match="apk_expiration"):
+        Vehicle.from_dict(
+            {
+                "merk": "SKODA",
+                "kenteken": "11ZKZ3",
+                "handelsbenaming": "CITIGO",
+                "vervaldatum_apk": value,
+            }
+        )
+
+
+def test_missing_brand() -> None:
+    """Test a missing brand is reported as a missing field."""
+    with pytest.raises(MissingField, match="brand"):
+        Vehicle.from_dict({"kenteken": "11ZKZ3", "handelsbenaming": "CITIGO"})
+
+
+async def test_no_license_plate_provided() -> None:
+    """Test getting Vehicle without license plate."""
+    rdw = RDW()
+    with pytest.raises(RDWError):
+        await rdw.vehicle()
+
+
+async def test_vehicles(
+    aresponses: ResponsesMockServer,
+    snapshot: SnapshotAssertion,
+    session: aiohttp.ClientSession,
+) -> None:
+    """Test getting information about multiple vehicles at once."""
+
+    async def response_handler(request: BaseRequest) -> Response:
+        """Response handler for this test."""
+        assert request.query["$where"] == "kenteken in('0001TJ','11ZKZ3','00''00')"
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=orjson.dumps(
+                orjson.loads(load_fixture("11ZKZ3.json"))
+                + orjson.loads(load_fixture("0001TJ.json"))
+            ).decode(),
+        )
+
     aresponses.add(
         "opendata.rdw.nl",
         "/resource/m9d7-ebf2.json",
         "GET",
-        aresponses.Response(
-            status=200,
-            headers={"Content-Type": "application/json"},
-            text=load_fixture(f"{license_plate}.json"),
-        ),
+        response_handler,
     )
-    async with aiohttp.ClientSession() as session:
-        rdw = RDW(session=session)
-        vehicle: Vehicle = await rdw.vehicle(license_plate)
-        assert vehicle == snapshot
-        assert vehicle.to_json() == snapshot
+    rdw = RDW(session=session)
+    vehicles = await rdw.vehicles(["00-01-TJ", "11-ZKZ-3", "0001TJ", "00'00"])
+    assert [vehicle.license_plate for vehicle in vehicles] == ["0001TJ", "11ZKZ3"]
+    assert vehicles == snapshot
 
 
-async def test_no_vehicle(aresponses: ResponsesMockServer) -> None:
-    """Test getting non-existing Vehicle."""
+async def test_vehicles_batched(
+    aresponses: ResponsesMockServer,
+    monkeypatch: pytest.MonkeyPatch,
+    session: aiohttp.ClientSession,
+) -> None:
+    """Test multiple vehicles are looked up in batches."""
+    monkeypatch.setattr(rdw_module, "BATCH_SIZE", 1)
+
+    async def response_handler(request: BaseRequest) -> Response:
+        """Response handler for this test."""
+        plate = request.query["$where"].split("'")[1]
+        return aresponses.Response(
+            status=200,
+            headers={"Content-Type": "application/json"},
+            text=load_fixture(f"{plate}.json"),
+        )
+
     aresponses.add(
         "opendata.rdw.nl",
         "/resource/m9d7-ebf2.json",
         "GET",
-        aresponses.Response(
+        response_handler,
+        repeat=2,
+    )
+    rdw = RDW(session=session)
+    vehicles = await rdw.vehicles(["11-ZKZ-3", "00-01-TJ"])
+    assert [vehicle.license_plate for vehicle in vehicles] == [
+        "11ZKZ3",
+        "0001TJ",
+    ]
+
+
+async def test_vehicles_cache(
+    aresponses: ResponsesMockServer,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test looking up multiple vehicles uses and fills the cache."""
+
+    async def response_handler(request: BaseRequest) -> Response:
+        """Response handler for this test."""
+        assert request.query["$where"] == "kenteken in('0001TJ','00''00')"
+        return aresponses.Response(
             status=200,
             headers={"Content-Type": "application/json"},
-            text=load_fixture("no_vehicles.json"),
-        ),
-    )
-    async with aiohttp.ClientSession() as session:
-        rdw = RDW(session=session)
-        with pytest.raises(RDWUnknownLicensePlateError):
-            await rdw.vehicle("00-00-00")
+            text=load_fixture("0001TJ.json"),
+        )
 
+    rdw_mock("11ZKZ3.json")
+    aresponses.add(
+        "opendata.rdw.nl",
+        "/resource/m9d7-ebf2.json",
+        "GET",
+        response_handler,
+    )
+    rdw = RDW(session=session)
+    vehicle = await rdw.vehicle("11ZKZ3")
+    vehicles = await rdw.vehicles(["11-ZKZ-3", "00-01-TJ", "00'00"])
+    assert vehicles[0] == vehicle
+    assert vehicles[0] is not vehicle
+    assert [vehicle.license_plate for vehicle in vehicles] == ["11ZKZ3", "0001TJ"]
 
-async def test_no_license_plate_provided() -> None:
-    """Test getting Vehicle without license plate."""
-    rdw = RDW()
-    with pytest.raises(RDWError):
-        await rdw.vehicle()
+    assert await rdw.vehicle("0001TJ") == vehicles[1]
+    assert await rdw.vehicles(["0001TJ", "00'00"]) == vehicles[1:]
+    with pytest.raises(RDWUnknownLicensePlateError):
+        await rdw.vehicle("00'00")
+    assert len(aresponses.history) == 2
+    aresponses.assert_plan_strictly_followed()
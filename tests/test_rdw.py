@@ -2,59 +2,229 @@
 
 # pylint: disable=protected-access
 import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 
 import aiohttp
 import pytest
 from aresponses import Response, ResponsesMockServer
 
 from vehicle import RDW
+from vehicle import rdw as rdw_module
 from vehicle.const import Dataset
 from vehicle.exceptions import RDWConnectionError, RDWError
 
 
-async def test_json_request(aresponses: ResponsesMockServer) -> None:
+async def test_json_request(
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
     """Test JSON response is handled correctly."""
-    aresponses.add(
-        "opendata.rdw.nl",
-        "/resource/m9d7-ebf2.json",
-        "GET",
-        aresponses.Response(
-            status=200,
-            headers={"Content-Type": "application/json"},
-            text='{"status": "ok"}',
-        ),
-    )
-    async with aiohttp.ClientSession() as session:
-        rdw = RDW(session=session)
-        response = await rdw._request(Dataset.PLATED_VEHICLES)
-        assert response == '{"status": "ok"}'
-        await rdw.close()
+    rdw_mock(text='{"status": "ok"}')
+    rdw = RDW(session=session)
+    response = await rdw._request(Dataset.PLATED_VEHICLES)
+    assert response == b'{"status": "ok"}'
+    await rdw.close()
+
+
+async def use_shared_session(rdw: RDW) -> aiohttp.ClientSession:
+    """Make an RDW object use the shared session, like a lookup does."""
+    session = await rdw._use_shared_session(rdw._shared_session_in_use)
+    rdw._shared_session_in_use = session
+    return session
 
 
-async def test_internal_session(aresponses: ResponsesMockServer) -> None:
+async def test_internal_session(
+    rdw_mock: Callable[..., None],
+) -> None:
     """Test JSON response is handled correctly."""
-    aresponses.add(
-        "opendata.rdw.nl",
-        "/resource/m9d7-ebf2.json",
-        "GET",
-        aresponses.Response(
-            status=200,
-            headers={"Content-Type": "application/json"},
-            text='{"status": "ok"}',
-        ),
-    )
+    rdw_mock(text='{"status": "ok"}')
     async with RDW() as rdw:
         response = await rdw._request(Dataset.PLATED_VEHICLES)
-        assert response == '{"status": "ok"}'
+        assert response == b'{"status": "ok"}'
+        session = await RDW.shared_session()
+    assert not session.closed
+    await RDW.close_shared_session()
+    assert session.closed
+
+
+async def test_concurrent_internal_session(
+    monkeypatch: pytest.MonkeyPatch,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test concurrent requests on a new RDW object create a single session."""
+    rdw_mock(text='{"status": "ok"}', repeat=5)
+    sessions: list[aiohttp.ClientSession] = []
+
+    def client_session(*args: Any, **kwargs: Any) -> aiohttp.ClientSession:
+        """Keep track of the created client sessions."""
+        session = aiohttp.ClientSession(*args, **kwargs)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(rdw_module, "ClientSession", client_session)
+    async with RDW() as rdw:
+        responses = await asyncio.gather(
+            *(rdw._request(Dataset.PLATED_VEHICLES) for _ in range(5))
+        )
+        assert responses == [b'{"status": "ok"}'] * 5
+    assert len(sessions) == 1
+    await RDW.close_shared_session()
+
+
+async def test_shared_session() -> None:
+    """Test RDW objects without a session share a single session."""
+    session = await RDW.shared_session()
+    assert await RDW.shared_session() is session
+    assert isinstance(session.connector, aiohttp.TCPConnector)
+    assert session.connector.limit == 128
+    assert session.connector.limit_per_host == 64
+
+    await RDW.close_shared_session()
+    assert session.closed
+    assert asyncio.get_running_loop() not in RDW._shared_sessions
+    await RDW.close_shared_session()
+
+    new_session = await RDW.shared_session()
+    assert new_session is not session
+    await RDW.close_shared_session()
+
+
+async def test_shared_session_reused(
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test RDW objects used one after another reuse the shared session."""
+    rdw_mock(text='{"status": "ok"}', repeat=2)
+    sessions = []
+    for _ in range(2):
+        async with RDW() as rdw:
+            await rdw._request(Dataset.PLATED_VEHICLES)
+            sessions.append(await RDW.shared_session())
+        await asyncio.sleep(0)
+    assert sessions[0] is sessions[1]
+    assert not sessions[0].closed
+    await RDW.close_shared_session()
+    assert sessions[0].closed
+
+
+async def test_shared_session_users() -> None:
+    """Test the shared session is only closed when unused for a while."""
+    loop = asyncio.get_running_loop()
+    async with RDW() as rdw:
+        session = await use_shared_session(rdw)
+        async with RDW() as other:
+            assert await use_shared_session(other) is session
+        assert RDW._shared_sessions[loop].idle_close is None
+    idle_close = RDW._shared_sessions[loop].idle_close
+    assert idle_close is not None
+
+    async with RDW() as rdw:
+        assert await use_shared_session(rdw) is session
+        await asyncio.sleep(0)
+        assert idle_close.cancelled()
+        assert not session.closed
+    await RDW.close_shared_session()
+    assert session.closed
+
+
+async def test_shared_session_idle(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the shared session is closed once it has been unused for a while."""
+    monkeypatch.setattr(rdw_module, "SHARED_SESSION_IDLE_TIMEOUT", 0)
+    async with RDW() as rdw:
+        session = await use_shared_session(rdw)
+    await asyncio.sleep(0.01)
+    assert session.closed
+    assert asyncio.get_running_loop() not in RDW._shared_sessions
+
+
+async def test_shared_session_closed_early() -> None:
+    """Test a user of a closed shared session leaves its successor alone."""
+    loop = asyncio.get_running_loop()
+    async with RDW() as rdw:
+        await use_shared_session(rdw)
+        await RDW.close_shared_session()
+        async with RDW() as other:
+            session = await use_shared_session(other)
+            await rdw.close()
+            assert RDW._shared_sessions[loop].users == 1
+    await RDW.close_shared_session()
+    assert session.closed
+
 
+async def test_shared_session_closed_by_user() -> None:
+    """Test a new shared session is created when the old one is closed."""
+    async with RDW() as rdw:
+        session = await use_shared_session(rdw)
+    idle_close = RDW._shared_sessions[asyncio.get_running_loop()].idle_close
+    assert idle_close is not None
+
+    await session.close()
+    assert await RDW.shared_session() is not session
+    await asyncio.sleep(0)
+    assert idle_close.cancelled()
+    await RDW.close_shared_session()
+
+
+def test_shared_session_per_loop() -> None:
+    """Test every event loop has a shared session of its own."""
+    loop = asyncio.new_event_loop()
+    other_loop = asyncio.new_event_loop()
+    try:
+        session = loop.run_until_complete(RDW.shared_session())
+        other_session = other_loop.run_until_complete(RDW.shared_session())
+        assert other_session is not session
+        assert not session.closed
+        assert loop.run_until_complete(RDW.shared_session()) is session
+        loop.run_until_complete(RDW.close_shared_session())
+        other_loop.run_until_complete(RDW.close_shared_session())
+    finally:
+        loop.close()
+        other_loop.close()
+
+
+def test_shared_session_loop_shutdown() -> None:
+    """Test an unused shared session is closed when its event loop shuts down."""
+
+    async def main() -> aiohttp.ClientSession:
+        """Use the shared session, like a lookup does."""
+        async with RDW() as rdw:
+            return await use_shared_session(rdw)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        session = executor.submit(asyncio.run, main()).result()
+        assert session.closed
+        other_session = executor.submit(asyncio.run, main()).result()
+    assert other_session is not session
+    assert other_session.closed
+
+
+def test_shared_session_closed_loop() -> None:
+    """Test shared sessions of closed event loops are forgotten."""
+    loop = asyncio.new_event_loop()
+    session = loop.run_until_complete(RDW.shared_session())
+    loop.run_until_complete(session.close())
+    loop.close()
+
+    other_loop = asyncio.new_event_loop()
+    try:
+        other_loop.run_until_complete(RDW.shared_session())
+        assert loop not in RDW._shared_sessions
+        other_loop.run_until_complete(RDW.close_shared_session())
+    finally:
+        other_loop.close()
 
-async def test_timeout(aresponses: ResponsesMockServer) -> None:
+
+async def test_timeout(
+    aresponses: ResponsesMockServer,
+    session: aiohttp.ClientSession,
+) -> None:
     """Test request timeout."""
 
     # Faking a timeout by sleeping
     async def response_handler(_: aiohttp.ClientResponse) -> Response:
         """Response handler for this test."""
-        await asyncio.sleep(2)
+        await asyncio.sleep(0.2)
         return aresponses.Response(body="Goodmorning!")
 
     aresponses.add(
@@ -64,45 +234,184 @@ async def test_timeout(aresponses: ResponsesMockServer) -> None:
         response_handler,
     )
 
-    async with aiohttp.ClientSession() as session:
-        rdw = RDW(session=session, request_timeout=1)
-        with pytest.raises(RDWConnectionError):
-            assert await rdw._request(Dataset.PLATED_VEHICLES)
+    rdw = RDW(session=session)
+    rdw.request_timeout = 0.01
+    with pytest.raises(RDWConnectionError):
+        assert await rdw._request(Dataset.PLATED_VEHICLES)
 
 
-async def test_http_error400(aresponses: ResponsesMockServer) -> None:
+async def test_http_error400(
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
     """Test HTTP 404 response handling."""
-    aresponses.add(
-        "opendata.rdw.nl",
-        "/resource/m9d7-ebf2.json",
-        "GET",
-        aresponses.Response(text="OMG PUPPIES!", status=404),
+    rdw_mock(text="OMG PUPPIES!", status=404, content_type="text/plain")
+
+    rdw = RDW(session=session)
+    with pytest.raises(RDWError):
+        assert await rdw._request(Dataset.PLATED_VEHICLES)
+
+
+async def test_retry_server_error(
+    aresponses: ResponsesMockServer,
+    monkeypatch: pytest.MonkeyPatch,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test requests are retried on server errors."""
+    monkeypatch.setattr(rdw_module, "RETRY_BACKOFF", 0)
+    rdw_mock(text="Too many requests", status=429, content_type="text/plain")
+    rdw_mock(
+        text="Service unavailable",
+        status=503,
+        content_type="text/plain",
+        headers={"Retry-After": "0"},
+    )
+    rdw_mock(text='{"status": "ok"}')
+
+    rdw = RDW(session=session)
+    response = await rdw._request(Dataset.PLATED_VEHICLES)
+    assert response == b'{"status": "ok"}'
+    aresponses.assert_plan_strictly_followed()
+
+
+async def test_retry_exhausted(
+    aresponses: ResponsesMockServer,
+    monkeypatch: pytest.MonkeyPatch,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test a request fails after the maximum number of attempts."""
+    monkeypatch.setattr(rdw_module, "RETRY_BACKOFF", 0)
+    rdw_mock(
+        text="Internal server error",
+        status=500,
+        content_type="text/plain",
+        repeat=rdw_module.REQUEST_ATTEMPTS,
+    )
+
+    rdw = RDW(session=session)
+    with pytest.raises(RDWConnectionError):
+        assert await rdw._request(Dataset.PLATED_VEHICLES)
+    aresponses.assert_plan_strictly_followed()
+
+
+async def test_retry_after_invalid(
+    aresponses: ResponsesMockServer,
+    monkeypatch: pytest.MonkeyPatch,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test an invalid Retry-After falls back to the exponential backoff."""
+    monkeypatch.setattr(rdw_module, "RETRY_BACKOFF", 0)
+    rdw_mock(
+        text="Too many requests",
+        status=429,
+        content_type="text/plain",
+        headers={"Retry-After": "²"},
     )
+    rdw_mock(text='{"status": "ok"}')
+
+    rdw = RDW(session=session)
+    response = await rdw._request(Dataset.PLATED_VEHICLES)
+    assert response == b'{"status": "ok"}'
+    aresponses.assert_plan_strictly_followed()
+
+
+async def test_retry_after_too_long(
+    aresponses: ResponsesMockServer,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test a request is not retried when asked to wait too long."""
+    rdw_mock(
+        text="Too many requests",
+        status=429,
+        content_type="text/plain",
+        headers={"Retry-After": "86400"},
+    )
+
+    rdw = RDW(session=session)
+    with pytest.raises(RDWConnectionError):
+        assert await rdw._request(Dataset.PLATED_VEHICLES)
+    aresponses.assert_plan_strictly_followed()
 
-    async with aiohttp.ClientSession() as session:
-        rdw = RDW(session=session)
-        with pytest.raises(RDWError):
-            assert await rdw._request(Dataset.PLATED_VEHICLES)
 
+async def test_retry_connection_error(
+    monkeypatch: pytest.MonkeyPatch,
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
+    """Test requests are retried on connection errors."""
+    monkeypatch.setattr(rdw_module, "RETRY_BACKOFF", 0)
+    rdw_mock(text='{"status": "ok"}')
 
-async def test_unexpected_response(aresponses: ResponsesMockServer) -> None:
+    request = session.request
+    attempts = 0
+
+    def flaky_request(*args: Any, **kwargs: Any) -> Any:
+        """Fail the first attempt with a connection error."""
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise aiohttp.ClientConnectionError
+        return request(*args, **kwargs)
+
+    monkeypatch.setattr(session, "request", flaky_request)
+    rdw = RDW(session=session)
+    response = await rdw._request(Dataset.PLATED_VEHICLES)
+    assert response == b'{"status": "ok"}'
+    assert attempts == 2
+
+
+async def test_unexpected_response(
+    session: aiohttp.ClientSession,
+    rdw_mock: Callable[..., None],
+) -> None:
     """Test unexpected response handling."""
+    rdw_mock(text="OMG PUPPIES!", content_type="text/plain")
+
+    rdw = RDW(session=session)
+    with pytest.raises(RDWError):
+        assert await rdw._request(Dataset.PLATED_VEHICLES)
+
+
+async def test_unexpected_response_charset(
+    aresponses: ResponsesMockServer,
+    session: aiohttp.ClientSession,
+) -> None:
+    """Test an unexpected response is decoded using its charset."""
     aresponses.add(
         "opendata.rdw.nl",
         "/resource/m9d7-ebf2.json",
         "GET",
-        aresponses.Response(text="OMG PUPPIES!", status=200),
+        aresponses.Response(
+            status=200,
+            headers={"Content-Type": "text/plain; charset=iso-8859-1"},
+            body="Storing bij de RDW, probeer het later opnieuw: één".encode(
+                "iso-8859-1"
+            ),
+        ),
     )
 
-    async with aiohttp.ClientSession() as session:
-        rdw = RDW(session=session)
-        with pytest.raises(RDWError):
-            assert await rdw._request(Dataset.PLATED_VEHICLES)
+    rdw = RDW(session=session)
+    with pytest.raises(RDWError) as excinfo:
+        assert await rdw._request(Dataset.PLATED_VEHICLES)
+    assert excinfo.value.args[1]["response"].endswith("één")
 
 
-async def test_license_plate_normalization() -> None:
+@pytest.mark.parametrize(
+    "license_plate",
+    [
+        "AB-12-34",
+        "AB1234",
+        "AB1-23-4",
+        " Ab1-23-4 ",
+        "ab 12 34",
+        "AB\t12\t34\n",
+        "ab-12-34\r\n",
+    ],
+)
+def test_license_plate_normalization(license_plate: str) -> None:
     """Test normalization of license plates."""
-    assert RDW.normalize_license_plate("AB-12-34") == "AB1234"
-    assert RDW.normalize_license_plate("AB1234") == "AB1234"
-    assert RDW.normalize_license_plate("AB1-23-4") == "AB1234"
-    assert RDW.normalize_license_plate(" Ab1-23-4 ") == "AB1234"
+    assert RDW.normalize_license_plate(license_plate) == "AB1234"